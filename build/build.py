@@ -1,22 +1,32 @@
+import json
 import logging
+import os
 import re
 import shutil
 import enum
-from dataclasses import dataclass, field
-from functools import cached_property
-from hashlib import sha256
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field, replace
+from functools import cached_property, lru_cache, partial
+from hashlib import blake2b, sha256
 from pathlib import Path
-from typing import Any, Optional, Protocol, TYPE_CHECKING
+from typing import Any, Callable, Iterator, Optional, Protocol, TYPE_CHECKING, cast
 
-from jinja2 import Template
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template
 from mistune import HTMLRenderer, create_markdown
+from mistune import __version__ as mistune_version
+from pygments import __version__ as pygments_version
 from pygments import highlight
 from pygments.formatters import HtmlFormatter
+from pygments.lexer import Lexer
 from pygments.lexers import get_lexer_by_name
 
 from build.env import Env
+from build.logging_config import worker_log_queue, worker_logging_init
 
 if TYPE_CHECKING:
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
     from _typeshed import ReadableBuffer
 else:
     ReadableBuffer = Any
@@ -30,17 +40,32 @@ BASE_HTML = "base.html"
 BLOG_INDEX_HTML = "blog_index.html"
 FRONT_MATTER_DELIM = "---"
 DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+PARALLEL_MIN_PAGES = 16
+COPY_CHUNK_SIZE = 1 << 20
+# Rendered markdown is cached by content, so the renderer versions are part of the key, as is
+# this module's source, which holds the renderer settings.
+MD_CACHE_SALT = (
+    f"mistune={mistune_version};pygments={pygments_version};".encode()
+    + blake2b(Path(__file__).read_bytes(), digest_size=16).digest()
+)
+
+
+@lru_cache(maxsize=None)
+def _get_lexer(lang: str) -> Lexer:
+    return get_lexer_by_name(lang, stripall=True)
 
 
 class _HTMLRenderer(HTMLRenderer):
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._formatter = HtmlFormatter(style="gruvbox-dark")
+
     def block_code(self, code: str, info: Optional[str] = "") -> str:
         if not info:
             return super().block_code(code, info)
 
         lang = info.split(None, 1)[0]
-        lexer = get_lexer_by_name(lang, stripall=True)
-        formatter = HtmlFormatter(style="gruvbox-dark")
-        return highlight(code, lexer, formatter)
+        return highlight(code, _get_lexer(lang), self._formatter)
 
 
 _markdown = create_markdown(renderer=_HTMLRenderer())
@@ -51,7 +76,7 @@ class _PageType(enum.Enum):
     blog_post = "blog_post"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class _PageMetadata:
     href: str
     page_type: _PageType
@@ -59,11 +84,37 @@ class _PageMetadata:
     date: Optional[str] = None
 
     def __post_init__(self) -> None:
-        assert self.href, "Page must have an href"
-        assert self.title, "Page must have a title"
+        if not self.href:
+            raise ValueError("Page must have an href")
+        if not self.title:
+            raise ValueError("Page must have a title")
         if self.page_type == _PageType.blog_post:
-            assert self.date is not None, "Blog post must have a date"
-            assert DATE_RE.match(self.date), "Blog post date must be in the format YYYY-MM-DD"
+            if self.date is None:
+                raise ValueError("Blog post must have a date")
+            if not DATE_RE.fullmatch(self.date):
+                raise ValueError("Blog post date must be in the format YYYY-MM-DD")
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "href": self.href,
+            "page_type": self.page_type.value,
+            "title": self.title,
+            "date": self.date,
+        }
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> "_PageMetadata":
+        return cls(
+            href=data["href"],
+            page_type=_PageType(data["page_type"]),
+            title=data["title"],
+            date=data["date"],
+        )
+
+
+# Output path, encoded HTML, metadata and markdown cache key of a rendered page.
+_RenderedPage = tuple[Path, bytes, _PageMetadata, str]
+_PageMap = Callable[[Callable[[Path], _RenderedPage], list[Path]], Iterator[_RenderedPage]]
 
 
 class Hash(Protocol):
@@ -71,12 +122,52 @@ class Hash(Protocol):
     def hexdigest(self) -> str: ...
 
 
+@dataclass
+class _RenderContext:
+    """The picklable subset of the build context needed to render a page."""
+    env: Env
+    pages_path: Path
+    blog_path: Path
+    dist_path: Path
+    templates_path: Path
+    jinja_cache_path: Path
+    md_cache_path: Path
+
+    @cached_property
+    def pages_prefix(self) -> str:
+        return str(self.pages_path) + os.sep
+
+    @cached_property
+    def jinja_env(self) -> Environment:
+        # Templates don't change during a build. Compiled templates are cached on disk, so later
+        # builds and other worker processes skip compiling unless a template's source changed.
+        return Environment(
+            loader=FileSystemLoader(self.templates_path),
+            auto_reload=False,
+            bytecode_cache=FileSystemBytecodeCache(str(self.jinja_cache_path)),
+        )
+
+    @cached_property
+    def base_template(self) -> Template:
+        return self.jinja_env.get_template(BASE_HTML)
+
+    @cached_property
+    def blog_index_template(self) -> Template:
+        return self.jinja_env.get_template(BLOG_INDEX_HTML)
+
+
 @dataclass
 class _BuildContext:
     env: Env
     root_path: Path
     build_sha: Hash
     blog_posts: list[_PageMetadata] = field(default_factory=list)
+    # Manifest entries from the previous build, keyed by output path. Empty unless the build is
+    # incremental. Static files copied into dist have an entry too, with no key.
+    prev_manifest: dict[str, Any] = field(default_factory=dict)
+    manifest: dict[str, Any] = field(default_factory=dict)
+    # Markdown cache keys of every page in this build. Other cache entries are pruned.
+    md_cache_keys: set[str] = field(default_factory=set)
 
     @cached_property
     def build_path(self) -> Path:
@@ -103,19 +194,37 @@ class _BuildContext:
         return self.root_path / "dist"
 
     @cached_property
-    def base_template(self) -> Template:
-        with open(self.templates_path / BASE_HTML) as f:
-            return Template(f.read())
+    def jinja_cache_path(self) -> Path:
+        return self.root_path / ".jinja_cache"
 
-    @property
-    def blog_index_template(self) -> Template:
-        with open(self.templates_path / BLOG_INDEX_HTML) as f:
-            return Template(f.read())
+    @cached_property
+    def md_cache_path(self) -> Path:
+        return self.root_path / ".md_cache"
+
+    @cached_property
+    def render_ctx(self) -> _RenderContext:
+        return _RenderContext(
+            env=self.env,
+            pages_path=self.pages_path,
+            blog_path=self.blog_path,
+            dist_path=self.dist_path,
+            templates_path=self.templates_path,
+            jinja_cache_path=self.jinja_cache_path,
+            md_cache_path=self.md_cache_path,
+        )
+
+    @cached_property
+    def templates_key(self) -> list[int]:
+        return [(self.templates_path / name).stat().st_mtime_ns for name in (BASE_HTML, BLOG_INDEX_HTML)]
 
     @cached_property
     def sha_path(self) -> Path:
         return self.dist_path / "sha256.txt"
 
+    @cached_property
+    def manifest_path(self) -> Path:
+        return self.dist_path / ".manifest.json"
+
     def get_sha(self) -> str:
         return self.build_sha.hexdigest()
 
@@ -131,9 +240,11 @@ def _assert_project_root(env: Env, path: Path) -> None:
 
 
 def _ensure_dir(dir_path: Path) -> None:
-    if not dir_path.exists():
-        dir_path.mkdir(parents=True)
-    elif not dir_path.is_dir():
+    # One mkdir in the common case. exist_ok only tolerates an existing directory, so an existing
+    # file still raises FileExistsError.
+    try:
+        dir_path.mkdir(parents=True, exist_ok=True)
+    except FileExistsError:
         raise ValueError(f"Expected {dir_path} to be a directory")
 
 
@@ -146,40 +257,58 @@ def _clean_dist(ctx: _BuildContext) -> None:
         raise ValueError(f"Expected {ctx.dist_path} to be a directory")
 
 
-def _is_dotfile(path: Path) -> bool:
-    return path.name.startswith(".")
+def _is_dotfile(entry: "os.DirEntry[str]") -> bool:
+    return entry.name.startswith(".")
 
 
-def _is_md(path: Path) -> bool:
-    return path.suffix == ".md"
+def _scan_dir(path: Path) -> list["os.DirEntry[str]"]:
+    # DirEntry.is_dir() answers from the d_type returned with the listing, sparing a stat per
+    # entry. Sort so that the traversal order, and with it the build sha, doesn't depend on the
+    # filesystem.
+    with os.scandir(path) as entries:
+        return sorted(entries, key=lambda entry: entry.name)
 
 
 def _parse_front_matter(src_path: Path, md_content: str) -> tuple[dict[str, str], str]:
-    front_matter = {}
-    lines = md_content.splitlines()
-    if lines[0] != FRONT_MATTER_DELIM:
+    md_content = md_content.replace("\r\n", "\n")
+    if not md_content.startswith(FRONT_MATTER_DELIM + "\n"):
         raise ValueError(f"Page {src_path} is missing front matter")
-    i = 1
-    while lines[i] != FRONT_MATTER_DELIM:
-        line = lines[i]
-        key, value = line.split(":", 1)
-        front_matter[key.strip()] = value.strip()
-        i += 1
 
-    return front_matter, "\n".join(lines[i + 1:])
+    # Start at the newline ending the opening delimiter so that empty front matter still matches.
+    header, sep, body = md_content[len(FRONT_MATTER_DELIM):].partition(f"\n{FRONT_MATTER_DELIM}\n")
+    if not sep:
+        # The closing delimiter may also be the last line of the file, leaving an empty body.
+        if not header.endswith(f"\n{FRONT_MATTER_DELIM}"):
+            raise ValueError(f"Page {src_path} has unterminated front matter")
+        header = header[:-len(FRONT_MATTER_DELIM) - 1]
 
+    front_matter = {}
+    for line in header.split("\n")[1:]:
+        key, sep, value = line.partition(":")
+        if not sep:
+            raise ValueError(f"Page {src_path} has a front matter line without a key: {line!r}")
+        front_matter[key.strip()] = value.strip()
+    return front_matter, body
 
-def _read_md(path: Path) -> tuple[dict[str, str], str]:
-    assert _is_md(path), f"Expected {path} to be a markdown file"
-    with open(path) as f:
-        raw_content = f.read()
 
+def _read_md(path: Path) -> tuple[dict[str, str], str]:
+    raw_content = path.read_bytes().decode("utf-8")
     return _parse_front_matter(path, raw_content)
 
 
-def _write_html(path: Path, content: str) -> None:
-    with open(path, "w") as f:
-        f.write(content)
+def _write_html(path: Path, content: bytes) -> None:
+    path.write_bytes(content)
+
+
+def _copy_file(ctx: _BuildContext, src_path: Path, dst_path: Path) -> None:
+    """Copy a static file, folding its contents into the build sha in the same pass."""
+    logger.info(f"Copying {src_path} -> {dst_path}")
+    with open(src_path, "rb") as src, open(dst_path, "wb") as dst:
+        while chunk := src.read(COPY_CHUNK_SIZE):
+            ctx.update_sha(chunk)
+            dst.write(chunk)
+    # Recorded so that an incremental build can remove the copy once the source is gone.
+    ctx.manifest[str(dst_path)] = {"key": None}
 
 
 def _copy_assets(ctx: _BuildContext) -> None:
@@ -187,35 +316,83 @@ def _copy_assets(ctx: _BuildContext) -> None:
     while src_dirs:
         src_dir = src_dirs.pop()
         _ensure_dir(ctx.dist_path / src_dir.relative_to(ctx.assets_path))
-        for src_path in src_dir.iterdir():
-            if _is_dotfile(src_path):
+        for entry in _scan_dir(src_dir):
+            if _is_dotfile(entry):
                 continue
-            if src_path.is_dir():
+            src_path = Path(entry.path)
+            if entry.is_dir():
                 src_dirs.append(src_path)
             else:
-                dst_path = ctx.dist_path / src_path.relative_to(ctx.assets_path)
-                logger.info(f"Copying {src_path} -> {dst_path}")
-                shutil.copy(src_path, dst_path)
+                _copy_file(ctx, src_path, ctx.dist_path / src_path.relative_to(ctx.assets_path))
+
+
+def _page_dir(ctx: _RenderContext, src_path: Path) -> str:
+    """Return the directory of a page relative to pages/, e.g. "blog/some-post"."""
+    # Pages always live under pages_path, so slicing the string is enough; Path.relative_to
+    # would walk and rebuild the path parts.
+    return os.path.dirname(str(src_path)[len(ctx.pages_prefix):])
+
+
+def _html_path(ctx: _RenderContext, page_dir: str) -> Path:
+    return ctx.dist_path / page_dir / "index.html"
+
+
+def _md_cache_key(md_content: str) -> str:
+    return blake2b(MD_CACHE_SALT + md_content.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _render_md(ctx: _RenderContext, cache_key: str, md_content: str) -> str:
+    """Render markdown to HTML, reusing the output of any earlier build with the same content."""
+    cache_path = ctx.md_cache_path / f"{cache_key}.html"
+    try:
+        return cache_path.read_bytes().decode("utf-8")
+    except FileNotFoundError:
+        pass
+
+    html_content = cast(str, _markdown(md_content))
+    # Workers may render the same content concurrently, so write to a private file and move it
+    # into place.
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(html_content.encode("utf-8"))
+    os.replace(tmp_path, cache_path)
+    return html_content
+
 
+# Set once per process by _init_worker, either in a pool worker or in the main process when
+# rendering serially.
+_worker_ctx: Optional[_RenderContext] = None
 
-def _gen_page(ctx: _BuildContext, src_path: Path) -> None:
-    dst_path = (ctx.dist_path / src_path.relative_to(ctx.pages_path)).with_name("index.html")
+
+def _init_worker(
+    render_ctx: _RenderContext, log_queue: Optional["multiprocessing.Queue[logging.LogRecord]"] = None
+) -> None:
+    global _worker_ctx
+    _worker_ctx = render_ctx
+    if log_queue is not None:
+        worker_logging_init(log_queue)
+
+
+def _render_page(
+    src_path: Path, blog_posts: Optional[list[_PageMetadata]] = None
+) -> _RenderedPage:
+    ctx = _worker_ctx
+    assert ctx is not None, "_init_worker must be called before rendering pages"
+
+    page_dir = _page_dir(ctx, src_path)
+    dst_path = _html_path(ctx, page_dir)
 
     front_matter, md_content = _read_md(src_path)
     page_meta = _PageMetadata(
-        href = f"/{src_path.parent.relative_to(ctx.pages_path).as_posix()}/",
+        href=f"/{page_dir.replace(os.sep, '/')}/" if page_dir else "/",
         page_type=_PageType(front_matter["page_type"]),
         title=front_matter["title"],
         date=front_matter.get("date"),
     )
 
-    if page_meta.page_type == _PageType.blog_post:
-        ctx.blog_posts.append(page_meta)
-
-    html_content = _markdown(md_content)
-    assert isinstance(html_content, str)
-    if src_path.parent == ctx.blog_path:
-        html_content += ctx.blog_index_template.render(blog_posts=ctx.blog_posts)
+    md_cache_key = _md_cache_key(md_content)
+    html_content = _render_md(ctx, md_cache_key, md_content)
+    if blog_posts is not None:
+        html_content += ctx.blog_index_template.render(blog_posts=blog_posts)
 
     page = ctx.base_template.render(
         # Require front matter to have a title. Intentionally error if it doesn't.
@@ -225,48 +402,188 @@ def _gen_page(ctx: _BuildContext, src_path: Path) -> None:
         content=html_content
     )
 
-    ctx.update_sha(page.encode())
-    logger.info(f"Generating {src_path} -> {dst_path}")
-    _write_html(dst_path, page)
+    return dst_path, page.encode("utf-8"), page_meta, md_cache_key
+
+
+@contextmanager
+def _page_mapper(ctx: _BuildContext) -> Iterator[_PageMap]:
+    # Small batches render in this process, from a copy so that ctx.render_ctx never caches
+    # templates and stays picklable for the pool. Like a pool worker, it's initialized once.
+    _init_worker(replace(ctx.render_ctx))
+
+    with ExitStack() as stack:
+        executor: Optional["ProcessPoolExecutor"] = None
+
+        def page_map(fn: Callable[[Path], _RenderedPage], src_paths: list[Path]) -> Iterator[_RenderedPage]:
+            nonlocal executor
+            # Spinning up worker processes costs more than rendering a handful of pages, so
+            # small batches are rendered in-process.
+            if len(src_paths) < PARALLEL_MIN_PAGES:
+                return map(fn, src_paths)
+
+            if executor is None:
+                # Imported here because it pulls in multiprocessing, which builds small enough
+                # to render in-process never need.
+                from concurrent.futures import ProcessPoolExecutor
+
+                executor = stack.enter_context(ProcessPoolExecutor(
+                    max_workers=min(len(src_paths), os.cpu_count() or 1),
+                    initializer=_init_worker,
+                    initargs=(ctx.render_ctx, worker_log_queue()),
+                ))
+            return executor.map(fn, src_paths, chunksize=4)
+
+        yield page_map
+
+
+def _page_key(ctx: _BuildContext, src_path: Path, blog_posts: Optional[list[_PageMetadata]]) -> list[Any]:
+    # Everything that affects the rendered page, in a form that survives a JSON round trip.
+    key: list[Any] = [src_path.stat().st_mtime_ns, *ctx.templates_key, ctx.env.value]
+    if blog_posts is not None:
+        key.append([post.to_json() for post in blog_posts])
+    return key
+
+
+def _load_unchanged_page(
+    ctx: _BuildContext, src_path: Path, key: list[Any]
+) -> Optional[_RenderedPage]:
+    dst_path = _html_path(ctx.render_ctx, _page_dir(ctx.render_ctx, src_path))
+    entry = ctx.prev_manifest.get(str(dst_path))
+    if entry is None or entry["key"] != key or "md" not in entry:
+        return None
+
+    try:
+        page = dst_path.read_bytes()
+    except FileNotFoundError:
+        return None
+
+    return dst_path, page, _PageMetadata.from_json(entry["meta"]), entry["md"]
+
+
+def _gen_page_batch(
+    ctx: _BuildContext,
+    page_map: _PageMap,
+    src_paths: list[Path],
+    blog_posts: Optional[list[_PageMetadata]] = None,
+) -> None:
+    keys = [_page_key(ctx, src_path, blog_posts) for src_path in src_paths]
+    unchanged = [_load_unchanged_page(ctx, src_path, key) for src_path, key in zip(src_paths, keys)]
+    stale_paths = [src_path for src_path, page in zip(src_paths, unchanged) if page is None]
+    rendered = page_map(partial(_render_page, blog_posts=blog_posts), stale_paths)
+
+    # Fold pages into the sha in traversal order regardless of which ones were re-rendered.
+    for src_path, key, cached in zip(src_paths, keys, unchanged):
+        if cached is None:
+            dst_path, page, page_meta, md_cache_key = next(rendered)
+            logger.info(f"Generating {src_path} -> {dst_path}")
+            _write_html(dst_path, page)
+        else:
+            dst_path, page, page_meta, md_cache_key = cached
+            logger.info(f"Unchanged {src_path}")
+
+        if page_meta.page_type == _PageType.blog_post:
+            ctx.blog_posts.append(page_meta)
+        ctx.update_sha(page)
+        ctx.md_cache_keys.add(md_cache_key)
+        ctx.manifest[str(dst_path)] = {"key": key, "meta": page_meta.to_json(), "md": md_cache_key}
 
 
-def _gen_pages(ctx: _BuildContext, path: Optional[Path] = None, recurse: bool = True) -> None:
+def _walk_pages(ctx: _BuildContext, path: Optional[Path] = None, recurse: bool = True) -> list[Path]:
+    """Create the dist directory tree, copy static files and return the pages to render."""
     if path is None:
         path = ctx.pages_path
 
-    assert path.is_dir(), f"Expected {path} to be a directory"
+    if not path.is_dir():
+        raise ValueError(f"Expected {path} to be a directory")
 
     dst_path = ctx.dist_path / path.relative_to(ctx.pages_path)
     _ensure_dir(dst_path)
 
+    pages: list[Path] = []
     files: list[Path] = []
-    for src_path in path.iterdir():
-        if _is_dotfile(src_path):
+    for entry in _scan_dir(path):
+        if _is_dotfile(entry):
             continue
-        if src_path.is_dir() and recurse:
-            _gen_pages(ctx, src_path)
-        if src_path.is_file():
-            files.append(src_path)
+        if entry.is_dir() and recurse:
+            pages.extend(_walk_pages(ctx, Path(entry.path)))
+        if entry.is_file():
+            files.append(Path(entry.path))
 
     for src_path in files:
         if src_path.name == INDEX_MD:
-            _gen_page(ctx, src_path)
+            pages.append(src_path)
         elif src_path.name == NOTES_MD:
             pass
         else:
-            dst_path = ctx.dist_path / src_path.relative_to(ctx.pages_path)
-            logger.info(f"Copying {src_path} -> {dst_path}")
-            shutil.copy(src_path, dst_path)
+            _copy_file(ctx, src_path, ctx.dist_path / src_path.relative_to(ctx.pages_path))
+
+    return pages
+
+
+def _gen_pages(ctx: _BuildContext) -> None:
+    src_paths = _walk_pages(ctx)
+    # Pages in the blog directory list the blog posts, so they can only be rendered once every
+    # post has been seen.
+    listing_paths = [p for p in src_paths if p.parent == ctx.blog_path]
+    page_paths = [p for p in src_paths if p.parent != ctx.blog_path]
+
+    with _page_mapper(ctx) as page_map:
+        _gen_page_batch(ctx, page_map, page_paths)
+        # Newest first, as listed. Sorting here also keeps listing manifest keys stable.
+        ctx.blog_posts.sort(key=lambda post: post.date or "", reverse=True)
+        _gen_page_batch(ctx, page_map, listing_paths, blog_posts=ctx.blog_posts)
+
+
+def _remove_deleted_outputs(ctx: _BuildContext) -> None:
+    """Delete pages and static files from the previous build whose source no longer exists."""
+    for dst_name in ctx.prev_manifest.keys() - ctx.manifest.keys():
+        dst_path = Path(dst_name)
+        logger.info(f"Removing {dst_path}")
+        dst_path.unlink(missing_ok=True)
+        try:
+            dst_path.parent.rmdir()
+        except OSError:
+            # The directory still holds other output.
+            pass
 
 
 def _write_sha(ctx: _BuildContext) -> None:
     sha = ctx.get_sha()
     logger.info(f"SHA256: {sha}")
-    with open(ctx.sha_path, "w") as f:
-        f.write(sha)
+    ctx.sha_path.write_bytes(sha.encode("ascii"))
 
 
-def build(env: Env) -> None:
+def _prune_md_cache(ctx: _BuildContext) -> None:
+    """Delete cached markdown that no page in this build uses."""
+    for entry in _scan_dir(ctx.md_cache_path):
+        if entry.name.removesuffix(".html") not in ctx.md_cache_keys:
+            os.unlink(entry.path)
+
+
+def _read_manifest(ctx: _BuildContext) -> Optional[dict[str, Any]]:
+    """Return the previous build's manifest, or None if it's missing or unreadable."""
+    try:
+        manifest = json.loads(ctx.manifest_path.read_bytes())
+    except FileNotFoundError:
+        return None
+    except ValueError:
+        logger.warning(f"Ignoring corrupt manifest {ctx.manifest_path}")
+        return None
+    if not isinstance(manifest, dict):
+        logger.warning(f"Ignoring corrupt manifest {ctx.manifest_path}")
+        return None
+    return manifest
+
+
+def _write_manifest(ctx: _BuildContext) -> None:
+    # Write to a private file and move it into place, so that a build interrupted mid-write
+    # doesn't leave a truncated manifest behind.
+    tmp_path = ctx.manifest_path.with_name(f"{ctx.manifest_path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(json.dumps(ctx.manifest).encode("utf-8"))
+    os.replace(tmp_path, ctx.manifest_path)
+
+
+def build(env: Env, incremental: bool = False) -> None:
     root_path = Path(".").resolve()
     _assert_project_root(env, root_path)
 
@@ -275,14 +592,27 @@ def build(env: Env) -> None:
     ctx = _BuildContext(env, root_path, sha256())
 
     logger.info(f"Setting up dist dir at {ctx.dist_path}")
-    _clean_dist(ctx)
+    # Reuse pages from the previous build whose inputs haven't changed. Without a manifest
+    # there's no telling what's stale, so start from a clean dist as a full build does.
+    prev_manifest = _read_manifest(ctx) if incremental else None
+    if prev_manifest is not None:
+        ctx.prev_manifest = prev_manifest
+    else:
+        _clean_dist(ctx)
+    _ensure_dir(ctx.jinja_cache_path)
+    _ensure_dir(ctx.md_cache_path)
 
     logger.info("Copying assets")
     _copy_assets(ctx)
 
     logger.info("Generating pages")
     _gen_pages(ctx)
+    _remove_deleted_outputs(ctx)
 
+    _prune_md_cache(ctx)
     _write_sha(ctx)
+    # Only the dev server builds incrementally, so the manifest is never shipped.
+    if env == Env.dev:
+        _write_manifest(ctx)
 
     logger.info("Build complete.")
@@ -1,10 +1,9 @@
 import logging
 import http.server
-from multiprocessing import Process
+import threading
 from pathlib import Path
 
 from build.build import build
-from build.logging_config import configure_logging
 from build.env import Env
 
 logger = logging.getLogger(__name__)
@@ -14,8 +13,6 @@ def _watch_dirs() -> None:
     # Use dynamic import so that build doesn't fail when watchfiles isn't installed
     import watchfiles
 
-    configure_logging()
-
     dirs = [
         Path("build").resolve(),
         Path("assets").resolve(),
@@ -25,19 +22,20 @@ def _watch_dirs() -> None:
     
     logger.info("Watching for changes")
     try:
-        for _ in watchfiles.watch(*dirs):
+        # Editors often touch a file several times per save. Wait for 150ms without changes
+        # before yielding so that a save triggers one rebuild rather than several.
+        for _ in watchfiles.watch(*dirs, step=150):
             logger.info("Detected change. Rebuilding...")
-            build(Env.dev)
+            try:
+                build(Env.dev, incremental=True)
+            except Exception:
+                # A half-written page shouldn't take the server down. Keep watching so the
+                # next save can fix it.
+                logger.exception("Rebuild failed")
     except KeyboardInterrupt:
         logger.info("Stopping watcher")
 
 
-def _start_watcher() -> Process:
-    process = Process(target=_watch_dirs, args=())
-    process.start()
-    return process
-
-
 def _create_server(directory: Path, port: int = 8000) -> http.server.HTTPServer:
     """Create an HTTP server for serving files from the specified directory."""
     # Create a handler class that serves from the specified directory
@@ -52,13 +50,11 @@ def _create_server(directory: Path, port: int = 8000) -> http.server.HTTPServer:
 def run(port: int) -> None:
     build(Env.dev)
 
-    watcher = _start_watcher()
-
     dist_path = Path("dist").resolve()
     server = _create_server(dist_path, port)
 
-    try:
-        logger.info("Starting server on http://localhost:%d", port)
-        server.serve_forever()
-    except KeyboardInterrupt:
-        watcher.join()
+    logger.info("Starting server on http://localhost:%d", port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    # Rebuilds run on the main thread, which also receives KeyboardInterrupt on shutdown.
+    _watch_dirs()
@@ -1,30 +1,446 @@
+"""Logging setup for the build and dev server.
+
+Set BUILD_VERBOSE=1 to include debug records, which are otherwise discarded.
+
+Set BUILD_LOG=0 to turn logging off entirely, e.g. when timing builds. Every log call then
+returns immediately, without formatting, queueing or writing anything.
+"""
+import atexit
 import logging
+import logging.handlers
+import os
+import queue
 import sys
-import multiprocessing
+import time
+from functools import lru_cache
+from typing import Any, Optional, TYPE_CHECKING
 
+# multiprocessing pulls in a long chain of modules. It's imported where it's needed so that
+# merely importing this module stays cheap.
+if TYPE_CHECKING:
+    import multiprocessing
 
-def configure_logging():
-    """Configure logging that works with multiprocessing."""
-    # This will ensure logging config is applied in both main and child processes
-    handler = logging.StreamHandler(sys.stderr)
-    handler.setFormatter(logging.Formatter(
-        fmt="%(asctime)s.%(msecs)03d [%(levelname)s] -- %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S"
-    ))
-    
+BUILD_VERBOSE = os.environ.get("BUILD_VERBOSE") == "1"
+BUILD_LOG_DISABLED = os.environ.get("BUILD_LOG") == "0"
+
+LOG_FORMAT = "%(asctime)s.%(msecs)03d [%(levelname)s] -- %(message)s"
+LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Size of the stderr write buffer. Records accumulate here while the listener is busy and are
+# written out together once it runs out of queued records.
+STDERR_BUFFER_SIZE = 1 << 16
+# Records beyond this many in flight are dropped rather than buffered without bound.
+LOG_QUEUE_SIZE = 10_000
+# How long shutdown waits for the listener to drain the queue.
+LISTENER_STOP_TIMEOUT = 5.0
+# Consecutive repeats of a log line are suppressed, but one is let through after this many
+# seconds so a recurring message doesn't go quiet indefinitely.
+DEDUP_WINDOW = 1.0
+# Modules imported once by the forkserver so that forked workers start with them loaded.
+FORKSERVER_PRELOAD = ["build.logging_config", "build.build"]
+
+
+# The ".000" to ".999" millisecond suffixes, rendered up front rather than with %03d per record.
+_MSECS = [f".{msecs:03d}" for msecs in range(1000)]
+
+
+class _FastFormatter(logging.Formatter):
+    """Formats records as "<date> <time>.<msecs> [<level>] -- <message>".
+
+    The layout is fixed, so format() builds the line directly instead of going through
+    Formatter's %-style substitution. strftime only runs when the wall-clock second changes.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(fmt=LOG_FORMAT, datefmt=LOG_DATE_FORMAT)
+        self._last_sec = -1
+        self._last_time = ""
+        # Only a handful of levels exist, so render the " [LEVEL] -- " part of the line once each.
+        self._level_prefixes = {
+            level: f" [{logging.getLevelName(level)}] -- "
+            for level in (logging.DEBUG, logging.INFO, logging.WARNING, logging.ERROR, logging.CRITICAL)
+        }
+
+    def format(self, record: logging.LogRecord) -> str:
+        # Tracebacks and stack info need the base class's handling. QueueHandler has usually
+        # rendered them into the message already.
+        if record.exc_info or record.exc_text or record.stack_info:
+            return super().format(record)
+        asctime = self.formatTime(record, self.datefmt)
+        level_prefix = self._level_prefixes.get(record.levelno) or f" [{record.levelname}] -- "
+        return f"{asctime}{_MSECS[int(record.msecs)]}{level_prefix}{record.getMessage()}"
+
+    def formatTime(self, record: logging.LogRecord, datefmt: Optional[str] = None) -> str:
+        # Milliseconds are appended separately, so seconds resolution is all that's needed here.
+        sec = int(record.created)
+        if sec != self._last_sec:
+            self._last_time = time.strftime(datefmt or self.default_time_format, self.converter(sec))
+            self._last_sec = sec
+        return self._last_time
+
+
+class _DedupFilter(logging.Filter):
+    """Suppresses consecutive repeats of a log line.
+
+    When a different line arrives, or the listener stops, a "... (suppressed N)" line is
+    emitted through the handler first, so the repeats are still accounted for.
+    """
+
+    def __init__(self, handler: logging.Handler) -> None:
+        super().__init__()
+        self._handler = handler
+        self._last: Optional[tuple[int, str]] = None
+        self._last_name = ""
+        self._last_created = 0.0
+        self._suppressed = 0
+        # Timestamp of the latest suppressed repeat, which the summary line is stamped with so
+        # that it doesn't appear later than the line that follows it.
+        self._suppressed_created = 0.0
+        self._suppressed_msecs = 0.0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        line = (record.levelno, record.getMessage())
+        # handle() runs the filters before taking the handler lock, and the main and worker
+        # listener threads share the handler, so take the lock here.
+        with self._handler.lock:
+            if line == self._last and record.created - self._last_created < DEDUP_WINDOW:
+                self._suppressed += 1
+                self._suppressed_created = record.created
+                self._suppressed_msecs = record.msecs
+                return False
+
+            self.report_suppressed()
+            self._last = line
+            self._last_name = record.name
+            self._last_created = record.created
+            return True
+
+    def report_suppressed(self) -> None:
+        """Emit the "... (suppressed N)" line for the current run of repeats, if there is one."""
+        with self._handler.lock:
+            if not self._suppressed or self._last is None:
+                return
+            levelno = self._last[0]
+            # emit() skips the filters, so the summary isn't filtered itself.
+            self._handler.emit(logging.makeLogRecord({
+                "name": self._last_name,
+                "levelno": levelno,
+                "levelname": logging.getLevelName(levelno),
+                "msg": "... (suppressed %d)",
+                "args": (self._suppressed,),
+                "created": self._suppressed_created,
+                "msecs": self._suppressed_msecs,
+            }))
+            self._suppressed = 0
+
+
+class _RawFdHandler(logging.Handler):
+    """Buffers formatted records as UTF-8 and writes them straight to a file descriptor.
+
+    Only the listener thread emits to this handler, so it skips the locking and text encoding
+    layers of sys.stderr. The buffer is written out on flush or once it reaches
+    STDERR_BUFFER_SIZE.
+    """
+
+    def __init__(self, fd: int) -> None:
+        super().__init__()
+        self._fd = fd
+        self._buf = bytearray()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self._buf += (self.format(record) + "\n").encode("utf-8")
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+        if len(self._buf) >= STDERR_BUFFER_SIZE:
+            self.flush()
+
+    def flush(self) -> None:
+        with self.lock:
+            try:
+                # os.write may write less than it was given.
+                while self._buf:
+                    del self._buf[:os.write(self._fd, self._buf)]
+            except OSError:
+                # Nowhere left to report this, so drop the output rather than kill the listener.
+                self._buf.clear()
+
+
+class _BoundedSimpleQueue(queue.SimpleQueue):
+    """A SimpleQueue whose put_nowait refuses records once LOG_QUEUE_SIZE are queued.
+
+    Unlike queue.Queue, SimpleQueue is implemented in C and put takes no Python-level mutex or
+    condition variable. The bound is checked without a lock, so it's approximate when several
+    threads log at once, which is fine for shedding load.
+    """
+
+    def put_nowait(self, item: Any) -> None:
+        if self.qsize() >= LOG_QUEUE_SIZE:
+            raise queue.Full
+        super().put_nowait(item)
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """A QueueHandler that drops records instead of blocking when the queue is full.
+
+    The number of dropped records is logged as a warning once the queue has room again, or
+    when report_dropped is called.
+    """
+
+    def __init__(self, log_queue: "queue.SimpleQueue[Any] | multiprocessing.Queue[Any]") -> None:
+        super().__init__(log_queue)
+        self._dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        # Called with the handler lock held, so the counter needs no further locking.
+        try:
+            if self._dropped:
+                self.queue.put_nowait(self._dropped_record())
+                self._dropped = 0
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self._dropped += 1
+
+    def report_dropped(self) -> None:
+        """Queue the warning for records dropped since the last one, waiting for room if need be.
+
+        Otherwise a burst that ends just before a quiet stretch or exit would go unreported.
+        """
+        with self.lock:
+            if not self._dropped:
+                return
+            try:
+                self.queue.put(self._dropped_record(), timeout=LISTENER_STOP_TIMEOUT)
+            except queue.Full:
+                return
+            self._dropped = 0
+
+    def _dropped_record(self) -> logging.LogRecord:
+        return logging.makeLogRecord({
+            "name": __name__,
+            "levelno": logging.WARNING,
+            "levelname": logging.getLevelName(logging.WARNING),
+            "msg": "Logging dropped %d records",
+            "args": (self._dropped,),
+        })
+
+
+class _FlushingQueueListener(logging.handlers.QueueListener):
+    """A QueueListener that flushes its handlers whenever the queue is drained.
+
+    If the handler feeding the queue lives in this process, its pending drop count is reported
+    at the same point.
+    """
+
+    def __init__(
+        self,
+        log_queue: "queue.SimpleQueue[Any] | multiprocessing.Queue[Any]",
+        *handlers: logging.Handler,
+        respect_handler_level: bool = False,
+        source: Optional[_DroppingQueueHandler] = None,
+    ) -> None:
+        super().__init__(log_queue, *handlers, respect_handler_level=respect_handler_level)
+        self._source = source
+
+    def dequeue(self, block: bool) -> logging.LogRecord:
+        if block and self.queue.empty():
+            if self._source is not None:
+                self._source.report_dropped()
+            self._flush()
+        return super().dequeue(block)
+
+    def enqueue_sentinel(self) -> None:
+        # The queue is bounded, so wait for the listener to make room rather than failing.
+        self.queue.put(self._sentinel, timeout=LISTENER_STOP_TIMEOUT)
+
+    def stop(self) -> None:
+        # Like QueueListener.stop, but give up on a stuck listener instead of hanging at exit.
+        if self._source is not None:
+            self._source.report_dropped()
+        if self._thread is not None:
+            try:
+                self.enqueue_sentinel()
+            except queue.Full:
+                pass
+            self._thread.join(LISTENER_STOP_TIMEOUT)
+            self._thread = None
+        # Nothing follows a run of repeats still in progress, so report it now.
+        for handler in self.handlers:
+            for filter_ in handler.filters:
+                if isinstance(filter_, _DedupFilter):
+                    filter_.report_suppressed()
+        self._flush()
+
+    def _flush(self) -> None:
+        for handler in self.handlers:
+            handler.flush()
+
+
+# Drain queued records into the real stderr handler on background threads: one for this
+# process's records and, once a worker pool asks for it, one for records sent by workers.
+_listeners: list[logging.handlers.QueueListener] = []
+_worker_log_queue: Optional["multiprocessing.Queue[logging.LogRecord]"] = None
+# Whether the multiprocessing start method has been dealt with in this process, so that
+# multiprocessing's context is only probed once.
+_start_method_set = False
+# The process that last ran configure_logging. A forked child inherits this module's state but
+# not the listener thread, so it has to configure logging again.
+_configured_pid: Optional[int] = None
+
+
+# The formatter is stateless apart from its timestamp cache, so one instance serves every handler.
+_FORMATTER = _FastFormatter()
+
+
+@lru_cache(maxsize=None)
+def _stderr_handler(pid: int) -> logging.Handler:
+    """Return the handler writing to stderr, created once per process.
+
+    Keyed by pid because a forked child must not share its parent's buffered output.
+    """
+    handler = _RawFdHandler(sys.stderr.fileno())
+    handler.setFormatter(_FORMATTER)
+    handler.addFilter(_DedupFilter(handler))
+    return handler
+
+
+def _start_listener(
+    log_queue: "queue.SimpleQueue[Any] | multiprocessing.Queue[Any]",
+    source: Optional[_DroppingQueueHandler] = None,
+) -> None:
+    listener = _FlushingQueueListener(
+        log_queue, _stderr_handler(os.getpid()), respect_handler_level=True, source=source
+    )
+    listener.start()
+    _listeners.append(listener)
+
+
+def _stop_listeners() -> None:
+    while _listeners:
+        _listeners.pop().stop()
+
+
+def _skip_unused_record_fields() -> None:
+    # LOG_FORMAT doesn't use any of these, so don't collect them for every record. If
+    # %(funcName)s, %(lineno)d or %(filename)s are ever added to the format they will show
+    # placeholder values until _srcfile is restored.
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+    logging.logAsyncioTasks = False
+    logging._srcfile = None
+
+
+def _configure_root_logger(handler: logging.Handler) -> None:
     # Clear existing handlers and configure root logger
     root_logger = logging.getLogger()
     # Only clear handlers if they exist (prevents issues in child processes)
     if root_logger.handlers:
         root_logger.handlers = []
-    root_logger.setLevel(logging.INFO)
+    if BUILD_VERBOSE:
+        root_logger.setLevel(logging.DEBUG)
+        logging.disable(logging.NOTSET)
+    else:
+        root_logger.setLevel(logging.INFO)
+        # Debug calls are dropped by a single module-level check, before any logger level is
+        # consulted or a record is built, even if some logger lowers its own level.
+        logging.disable(logging.DEBUG)
     root_logger.addHandler(handler)
-    
+
+
+def configure_logging():
+    """Configure logging that works with multiprocessing."""
+    global _worker_log_queue, _configured_pid
+
+    # Only configure once per process. Re-running would tear down and rebuild the handlers.
+    pid = os.getpid()
+    if _configured_pid == pid:
+        return
+    _configured_pid = pid
+
+    if BUILD_LOG_DISABLED:
+        root_logger = logging.getLogger()
+        root_logger.handlers = [logging.NullHandler()]
+        root_logger.setLevel(logging.CRITICAL + 1)
+        logging.disable(logging.CRITICAL)
+        return
+
+    _skip_unused_record_fields()
+    _stop_listeners()
+    _worker_log_queue = None
+
+    # Log calls only enqueue the record. Formatting and the write to stderr happen on the
+    # listener thread, so callers never block on stderr.
+    log_queue = _BoundedSimpleQueue()
+    queue_handler = _DroppingQueueHandler(log_queue)
+    _start_listener(log_queue, source=queue_handler)
+    _configure_root_logger(queue_handler)
+
+
+def _configure_multiprocessing() -> None:
+    global _start_method_set
+
+    if _start_method_set:
+        return
+    _start_method_set = True
+
+    import multiprocessing
+
     # Set the multiprocessing start method if not already set
     # This must be called before any Process objects are created
     if multiprocessing.get_start_method(allow_none=True) is None:
         try:
-            multiprocessing.set_start_method('spawn', force=False)
+            if sys.platform == "linux":
+                # Fork workers from a server process that has already imported the build
+                # pipeline, rather than booting a fresh interpreter per worker as spawn does.
+                # The server itself is started clean, so it shares spawn's safety.
+                multiprocessing.set_start_method("forkserver", force=False)
+                multiprocessing.set_forkserver_preload(FORKSERVER_PRELOAD)
+            else:
+                multiprocessing.set_start_method('spawn', force=False)
         except RuntimeError:
             # Method may already be set in child process
-            pass
\ No newline at end of file
+            pass
+
+
+def worker_log_queue() -> Optional["multiprocessing.Queue[logging.LogRecord]"]:
+    """Return the queue worker processes should log to, for passing to worker_logging_init.
+
+    Records put on it are formatted and written by a listener in this process, so workers never
+    write to stderr concurrently and lines don't interleave. Returns None if logging is off.
+
+    Call it before starting any worker process, as it also picks the start method. That's
+    deferred to here so that builds which never start a pool never import multiprocessing.
+    """
+    global _worker_log_queue
+    _configure_multiprocessing()
+    if BUILD_LOG_DISABLED:
+        return None
+    if _worker_log_queue is None:
+        import multiprocessing
+
+        _worker_log_queue = multiprocessing.Queue(LOG_QUEUE_SIZE)
+        _start_listener(_worker_log_queue)
+    return _worker_log_queue
+
+
+def worker_logging_init(log_queue: "multiprocessing.Queue[logging.LogRecord]") -> None:
+    """Send this worker process's log records to the parent's listener through log_queue.
+
+    Workers don't run the entry point, so configure_logging is never called in them.
+    """
+    _skip_unused_record_fields()
+    queue_handler = _DroppingQueueHandler(log_queue)
+    _configure_root_logger(queue_handler)
+
+    import multiprocessing.util
+
+    # Workers exit through multiprocessing's finalizers rather than atexit. The queue closes
+    # its feeder with exit priority 10, so report before that.
+    multiprocessing.util.Finalize(queue_handler, queue_handler.report_dropped, exitpriority=20)
+
+
+# Stop the listeners at exit so that queued records are flushed before the process ends.
+atexit.register(_stop_listeners)